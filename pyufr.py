@@ -15,6 +15,18 @@ _post_reset_wait: float                = .1 #s
 _post_write_emulation_ndef_wait: float = .1 #s
 _post_emulation_start_stop_wait: float = .1 #s
 
+# Period at which the receive thread checks whether it should stop, when
+# receiving in a background thread
+_rx_thread_poll_period: float = .1 #s
+
+# Pause between two polls of the reader when waiting for a card to come in the
+# field
+_card_poll_period: float = .05 #s
+
+# Maximum number of bytes read from a UDP or TCP socket at once. Large enough
+# to take in several answers, so they're all parsed from one read
+_socket_recv_size: int = 4096
+
 # Number of concurrent connection when scanning a subnet for Nano Onlines
 _subnet_probe_concurrent_connections: int = 100
 
@@ -30,6 +42,7 @@ __test_sleep_functions              = True
 __test_led_sound_functions          = True
 __test_esp_io                       = True
 __test_uid_functions                = True
+__test_blocking_uid_functions       = False
 __test_read_functions               = True
 __test_iso14443_4_functions         = True
 __test_anti_collision_functions     = True
@@ -39,15 +52,19 @@ __test_asynchronous_card_id_sending = True
 
 
 ### Modules
-from typing import Any, Type, List, Tuple, Dict, Callable, Generator, \
-			Union, Optional
+from typing import Any, Type, List, Tuple, Dict, Callable, \
+			Generator, Union, Optional
 from types import TracebackType
 import re
 import math
 import socket
-from time import sleep
+import select
+import struct
+import queue
+import threading
+from time import sleep, monotonic
 from enum import IntEnum
-from datetime import datetime
+from functools import lru_cache, wraps
 
 # Try to import optional modules but fail silently if they're not needed later
 try:
@@ -69,6 +86,35 @@ except:
 
 
 
+### Precompiled regular expressions
+_serial_net_dev_regex: re.Pattern = \
+			re.compile("^(serial|udp|tcp|ws)://(.+):([0-9]+)/*$")
+_http_dev_regex: re.Pattern = re.compile("^(http://.+/uart[12])/*$")
+_doc_status_regex: re.Pattern = \
+			re.compile("(STATUS|COMPLETION)\\s*:\\s*(.*)\n")
+
+
+
+### Decorators
+def _cached_reader_info(met: Callable) \
+			-> Callable:
+  """Decorator for uFRcomm methods that get fixed properties of the reader:
+  only query the reader the first time, then return the same value until the
+  device is closed
+  """
+
+  @wraps(met)
+  def cached_met(self: uFRcomm,
+			*args, **kwargs) \
+			-> Any:
+    if met.__name__ not in self._reader_info_cache:
+      self._reader_info_cache[met.__name__] = met(self, *args, **kwargs)
+    return self._reader_info_cache[met.__name__]
+
+  return cached_met
+
+
+
 ### Enums
 class uFRhead(IntEnum):
   CMD_HEADER: int                              = 0x55
@@ -412,6 +458,13 @@ class uFRanswer:
   """uFR command answer
   """
 
+  # A fresh answer is filled in for every command: use fixed slots rather than
+  # a per-instance dictionary
+  __slots__: Tuple[str, ...] = ("is_ack", "is_err", "is_rsp", "has_ext",
+				"is_async_id", "async_id", "header", "code",
+				"trailer", "ext_len", "val0", "val1", "checksum",
+				"ext", "ext_checksum")
+
   def __init__(self: uFRanswer) \
 		-> None:
     """__init__ method
@@ -431,37 +484,31 @@ class uFRanswer:
     self.has_ext: bool = False
     self.is_async_id: bool = False
 
-    self._got_async_id_prefix = False
     self.async_id: str = ""
 
-    self._got_header: bool = False
     self.header: int = 0
-
-    self._got_code: bool = False
     self.code: Union[uFRcmd, uFRerr] = uFRcmd._UNDEFINED
-
-    self._got_trailer: bool = False
     self.trailer: int = 0
-
-    self._got_ext_len: bool = False
     self.ext_len: int = 0
-
-    self._got_val0: bool = False
     self.val0: int = 0
-
-    self._got_val1: bool = False
     self.val1: int = 0
-
-    self._got_checksum: bool = False
     self.checksum: int = 0
 
-    self._got_ext: bool = False
-    self.ext: List[int] = []
-
+    self.ext: bytearray = bytearray()
     self.ext_checksum: int = 0
 
 
 
+  @property
+  def ext_mv(self: uFRanswer) \
+		-> memoryview:
+    """Zero-copy view of the extended packet
+    """
+
+    return memoryview(self.ext)
+
+
+
   def __repr__(self: uFRanswer) \
 		-> str:
     """Return a one-line human-readable description of the answer
@@ -481,10 +528,11 @@ class uFRanswer:
         desc += ", val0={:02x}h".format(self.val0)
       if self.val1 is not None:
         desc += ", val1={:02x}h".format(self.val1)
-      if self.has_ext and self.ext is not None and not self.is_ack:
+      if self.has_ext and self.ext and not self.is_ack:
+        hexext: str = self.ext.hex()
         desc += ", ext=("
-        desc += ", ".join(["{:02x}h".format(v) for v in self.ext])
-        desc += ")"
+        desc += "h, ".join([hexext[i:i + 2] for i in range(0, len(hexext), 2)])
+        desc += "h)"
 
     elif self.is_async_id:
 
@@ -565,14 +613,12 @@ class uFRdiscoveryResponse:
       raise ValueError("invalid UDP discovery datagram")
 
     self.ip = ".".join([str(b) for b in dgram[:4]])
-    self.uart1.port = dgram[4] + (dgram[5] << 8)
+    self.uart1.port = int.from_bytes(dgram[4:6], "little")
     self.uart1.is_udp = (dgram[6] == ord("U"))
-    self.uart1.baudrate = dgram[7] + (dgram[8] << 8) + \
-				(dgram[9] << 16) + (dgram[10] << 24)
-    self.uart2.port = dgram[11] + (dgram[12] << 8)
+    self.uart1.baudrate = int.from_bytes(dgram[7:11], "little")
+    self.uart2.port = int.from_bytes(dgram[11:13], "little")
     self.uart2.is_udp = (dgram[13] == ord("U"))
-    self.uart2.baudrate = dgram[14] + (dgram[15] << 8) + \
-				(dgram[16] << 16) + (dgram[17] << 24)
+    self.uart2.baudrate = int.from_bytes(dgram[14:18], "little")
     if len(dgram) > 20 and dgram[18] == 0x0b and dgram[-1] == 0:
       self.serial = dgram[19:-1].decode("ascii")
 
@@ -594,10 +640,80 @@ class uFRdiscoveryResponse:
 
 class uFRcomm:
 
+  ### Constants
+  # Reverse lookup tables, shared by all instances
+  __UFR_VAL_TO_CARD_TYPE: Dict[int, uFRcardType] = \
+			{ct.value: ct for ct in uFRcardType}
+  __UFR_VAL_TO_DL_CARD_TYPE: Dict[int, uFRDLCardType] = \
+			{dlct.value: dlct for dlct in uFRDLCardType}
+  __UFR_VAL_TO_EMU_MODE: Dict[int, uFRemuMode] = \
+			{em.value: em for em in uFRemuMode}
+  __UFR_VAL_TO_EMU_STATE: Dict[int, uFRemuState] = \
+			{st.value: st for st in uFRemuState}
+  __UFR_VAL_TO_PCD_MGR_STATE: Dict[int, uFRPCDMgrState] = \
+			{pmst.value: pmst for pmst in uFRPCDMgrState}
+  __UFR_VAL_TO_CMD: Dict[int, uFRcmd] = \
+			{cmd.value: cmd for cmd in uFRcmd}
+  __UFR_VAL_TO_ERR: Dict[int, uFRerr] = \
+			{err.value: err for err in uFRerr}
+  __UFR_VAL_TO_IOSTATE: Dict[int, uFRIOState] = \
+			{iostate.value: iostate for iostate in uFRIOState}
+  __UFR_TAG_COMM_TYPES: Tuple[uFRtagCommType, ...] = tuple(uFRtagCommType)
+
+  # Layout of a short command packet: header, command, trailer, length of the
+  # extended parameters, par0, par1 and checksum
+  __UFR_CMD_PACKET: struct.Struct = struct.Struct("7B")
+
+  # Little-endian 16-bit word, as used for addresses and lengths in extended
+  # command parameters
+  __UFR_U16: struct.Struct = struct.Struct("<H")
+
+  # Raw values of the enum members used when sending every command, to avoid
+  # looking them up in the enums each time
+  __UFR_CMD_HEADER: int = int(uFRhead.CMD_HEADER)
+  __UFR_CMD_TRAILER: int = int(uFRtrail.CMD_TRAILER)
+  __UFR_ACK_PART: int = int(uFRcmdExtPartAck.ACK_PART)
+  __UFR_ACK_LAST_PART: int = int(uFRcmdExtPartAck.ACK_LAST_PART)
+
+  # Answer header -> (is_ack, is_err, is_rsp) flags and expected trailer
+  __UFR_HEADER_FLAGS: Dict[int, Tuple[bool, bool, bool]] = {
+			uFRhead.ACK_HEADER: (True, False, False),
+			uFRhead.ERR_HEADER: (False, True, False),
+			uFRhead.RESPONSE_HEADER: (False, False, True)}
+  __UFR_HEADER_TO_TRAILER: Dict[int, int] = {
+			uFRhead.ACK_HEADER: uFRtrail.ACK_TRAILER,
+			uFRhead.ERR_HEADER: uFRtrail.ERR_TRAILER,
+			uFRhead.RESPONSE_HEADER: uFRtrail.RESPONSE_TRAILER}
+
+  # Authentication mode -> (key is a reader key index passed in par1, multiple
+  # blocks may be read at once, key is passed in the extended parameters)
+  __UFR_AUTH_MODE_PARMS: Dict[int, Tuple[bool, bool, bool]] = {
+			uFRauthMode.RKA_AUTH1A: (True, True, False),
+			uFRauthMode.RKA_AUTH1B: (True, True, False),
+			uFRauthMode.AKM1_AUTH1A: (False, False, False),
+			uFRauthMode.AKM1_AUTH1B: (False, False, False),
+			uFRauthMode.AKM2_AUTH1A: (False, False, False),
+			uFRauthMode.AKM2_AUTH1B: (False, False, False),
+			uFRauthMode.PK_AUTH1A: (False, False, True),
+			uFRauthMode.PK_AUTH1B: (False, False, True),
+			uFRauthMode.SAM_KEY_AUTH1A: (True, True, False),
+			uFRauthMode.SAM_KEY_AUTH1B: (True, True, False),
+			uFRauthMode.PK_AUTH1A_AES: (False, False, True),
+			uFRauthMode.PK_AUTH1B_AES: (False, False, True),
+			uFRauthMode.MFP_RKA_AUTH1A: (True, True, False),
+			uFRauthMode.MFP_RKA_AUTH1B: (True, True, False),
+			uFRauthMode.MFP_AKM1_AUTH1A: (False, False, False),
+			uFRauthMode.MFP_AKM1_AUTH1B: (False, False, False),
+			uFRauthMode.MFP_AKM2_AUTH1A: (False, False, False),
+			uFRauthMode.MFP_AKM2_AUTH1B: (False, False, False)}
+
+
+
   def __init__(self: uFRcomm,
 		dev: str,
 		restore_on_close: bool = False,
-		timeout: float = _default_ufr_timeout) \
+		timeout: float = _default_ufr_timeout,
+		rx_thread: bool = False) \
 		-> None:
     """__init__
     Open a connection. The device format is one of:
@@ -615,30 +731,14 @@ class uFRcomm:
     tcp://192.168.1.123:8881			# Nano Online slave TCP
     ws://192.168.1.123:8881			# Nano Online slave websocket
     http://ufr.localnet.org/uart1"		# Nano Online REST UART1
+
+    If rx_thread is asserted, data is received from the device in a
+    background thread, so that I/O latency overlaps with the processing of
+    the previous answers. This has no effect in HTTP mode, as HTTP is
+    synchronous by nature
     """
 
     ### Constants
-    # Reverse lookup tables
-    self.__UFR_HEADER_VALS: Tuple[int, ...] = tuple(map(int, uFRhead))
-    self.__UFR_CMD_VALS: Tuple[int, ...] = tuple(map(int, uFRcmd))
-    self.__UFR_ERR_VALS: Tuple[int, ...] = tuple(map(int, uFRerr))
-    self.__UFR_VAL_TO_CARD_TYPE: Dict[int, uFRcardType] = \
-			{ct.value: ct for ct in uFRcardType}
-    self.__UFR_VAL_TO_DL_CARD_TYPE: Dict[int, uFRDLCardType] = \
-			{dlct.value: dlct for dlct in uFRDLCardType}
-    self.__UFR_VAL_TO_EMU_MODE: Dict[int, uFRemuMode] = \
-			{em.value: em for em in uFRemuMode}
-    self.__UFR_VAL_TO_EMU_STATE: Dict[int, uFRemuState] = \
-			{st.value: st for st in uFRemuState}
-    self.__UFR_VAL_TO_PCD_MGR_STATE: Dict[int, uFRPCDMgrState] = \
-			{pmst.value: pmst for pmst in uFRPCDMgrState}
-    self.__UFR_VAL_TO_CMD: Dict[int, uFRcmd] = \
-			{cmd.value: cmd for cmd in uFRcmd}
-    self.__UFR_VAL_TO_ERR: Dict[int, uFRerr] = \
-			{err.value: err for err in uFRerr}
-    self.__UFR_VAL_TO_IOSTATE: Dict[int, uFRIOState] = \
-			{iostate.value: iostate for iostate in uFRIOState}
-
     # Leave sleep mode parameters
     self.__WAKE_UP_BYTE: int = 0x00
     self.__WAKE_UP_WAIT: float = .01 #s
@@ -654,6 +754,7 @@ class uFRcomm:
     self.udpsock: Optional[socket.socket] = None
     self._udphost: Optional[str] = None
     self._udpport: Optional[int] = None
+    self._udpaddr: Optional[Tuple[str, int]] = None
 
     self.tcpsock: Optional[socket.socket] = None
 
@@ -661,11 +762,24 @@ class uFRcomm:
 
     self.resturl: Optional[str] = None
     self.__postdata: str = ""
+    self.__httpsession: Optional[requests.Session] = None
 
     self._default_timeout: float = timeout
     self._current_timeout: float = timeout
 
-    self.__recbuf: List[int] = []
+    self._post_wake_up_wait: float = _post_wake_up_wait
+    self._post_reset_wait: float = _post_reset_wait
+    self._post_write_emulation_ndef_wait: float = \
+				_post_write_emulation_ndef_wait
+    self._post_emulation_start_stop_wait: float = \
+				_post_emulation_start_stop_wait
+
+    self.__recbuf: bytearray = bytearray()
+    self.__recbuf_pos: int = 0
+
+    self.__rxqueue: Optional[queue.SimpleQueue] = None
+    self.__rxthread: Optional[threading.Thread] = None
+    self.__rxthread_running: bool = False
 
     self._last_cmd: uFRcmd = uFRcmd._UNDEFINED
 
@@ -689,20 +803,22 @@ class uFRcomm:
 
     self._async_ids_cache: List[str] = []
 
+    self._reader_info_cache: Dict[str, Any] = {}
+
     # Find out the protocol and associated parameters
     proto: str
     p1: str
     p2: str
-    m: Optional[List]
+    m: Optional[re.Match]
 
-    m = re.findall("^(serial|udp|tcp|ws)://(.+):([0-9]+)/*$", dev)
+    m = _serial_net_dev_regex.match(dev)
     if m:
-      proto, p1, p2 = m[0]
+      proto, p1, p2 = m.groups()
     else:
-      m = re.findall("^(http://.+/uart[12])/*$", dev)
+      m = _http_dev_regex.match(dev)
       if m:
         proto = "http"
-        p1 = m[0]
+        p1 = m.group(1)
       else:
         proto = ""
 
@@ -711,23 +827,45 @@ class uFRcomm:
       self._baudrate = int(p2)
       self.serdev = serial.Serial(p1, self._baudrate, timeout = timeout)
 
+      # Ask the USB serial driver to pass on received data immediately rather
+      # than after its latency timer expires (16 ms by default on FTDI chips),
+      # as the reader's answers are much shorter than a USB packet. This is
+      # only supported by pyserial on Linux and by some drivers
+      try:
+        self.serdev.set_low_latency_mode(True)
+      except (AttributeError, NotImplementedError, OSError, ValueError):
+        pass
+
     elif proto == "udp":
       self.udpsock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
       self.udpsock.settimeout(timeout)
       self._udphost = socket.gethostbyname(p1)
       self._udpport = int(p2)
+      self._udpaddr = (self._udphost, self._udpport)
 
     elif proto == "tcp":
       self.tcpsock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
       self.tcpsock.settimeout(timeout)
       self.tcpsock.connect((socket.gethostbyname(p1), int(p2)))
 
+      # Commands are small request / response packets: send them right away
+      # rather than letting Nagle's algorithm hold them back, and detect dead
+      # connections
+      self.tcpsock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+      self.tcpsock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+      # Start probing an idle connection after 30 seconds rather than the
+      # system default (2 hours on Linux), where the platform lets us set it
+      if hasattr(socket, "TCP_KEEPIDLE"):
+        self.tcpsock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30)
+
     elif proto == "ws":
       self.websock = websocket.create_connection("ws://{}:{}".format(p1, p2))
       self.websock.settimeout(timeout)
 
     elif proto == "http":
       self.resturl = p1
+      self.__httpsession = requests.Session()
 
     else:
       raise uFRopenError("unknown uFR device {}".format(dev))
@@ -735,18 +873,33 @@ class uFRcomm:
     self._default_timeout = timeout
     self._current_timeout = timeout
 
+    # Start receiving in the background if needed
+    if rx_thread and self.resturl is None:
+      self.__rxqueue = queue.SimpleQueue()
+      self.__rxthread_running = True
+      self.__rxthread = threading.Thread(target = self._rx_thread_loop,
+						daemon = True)
+      self.__rxthread.start()
+
     # Get the current state of the reader if needed
     if restore_on_close:
 
-      # Unconditionally wake up the reader in case it's asleep
-      self.leave_sleep_mode()
+      # Don't leave the receive thread running if the reader can't be probed
+      try:
+
+        # Unconditionally wake up the reader in case it's asleep
+        self.leave_sleep_mode()
 
-      # Save the reader status, then anti-collision status and asynchronous
-      # card ID sending parameters if we can
-      if self.get_reader_status(save_status = True, timeout = timeout)[1] == \
-		uFRemuMode.TAG_EMU_DISABLED:
-        self.get_anti_collision_status(save_status = True, timeout = timeout)
-        self.get_card_id_send_conf(save_status = True, timeout = timeout)
+        # Save the reader status, then anti-collision status and asynchronous
+        # card ID sending parameters if we can
+        if self.get_reader_status(save_status = True,
+			timeout = timeout)[1] == uFRemuMode.TAG_EMU_DISABLED:
+          self.get_anti_collision_status(save_status = True, timeout = timeout)
+          self.get_card_id_send_conf(save_status = True, timeout = timeout)
+
+      except:
+        self._stop_rx_thread()
+        raise
 
       # Assume the red LED is off, since we can't probe its current state
       self.__saved_red_led_state = False
@@ -759,6 +912,10 @@ class uFRcomm:
     """ Wait until the reception times out, to clear any buffered data
     """
 
+    # Discard data that was received but hasn't been parsed yet
+    del self.__recbuf[:]
+    self.__recbuf_pos = 0
+
     while self.serdev is not None or self.udpsock is not None or \
 		self.tcpsock is not None or self.websock is not None:
       try:
@@ -771,26 +928,43 @@ class uFRcomm:
 
 
   def _checksum(self: uFRcomm,
-		data: Union[List[int], Tuple[int, ...], bytes]) \
+		data: Union[List[int], Tuple[int, ...], bytes, memoryview]) \
 		-> int:
     """Calculate the checksum of a row of bytes
     """
 
     csum: int = 0
     b: int
-    for b in data:
-      csum ^= b
+    nbits: int
+
+    # XOR short rows of bytes one by one
+    if len(data) < 32:
+      for b in data:
+        csum ^= b
+
+    # Turn longer rows of bytes into a single integer and fold it in half until
+    # only one byte is left, so the XORs run in C rather than once per byte
+    else:
+      csum = int.from_bytes(data if isinstance(data, (bytes, bytearray,
+					memoryview)) else bytes(data), "little")
+      nbits = (1 << (len(data) - 1).bit_length()) * 8
+      while nbits > 8:
+        nbits >>= 1
+        csum = (csum >> nbits) ^ (csum & ((1 << nbits) - 1))
+
     return (csum + 0x07) % 256
 
 
 
   def _uid_bytes2str(self: uFRcomm,
-			bytesuid: Union[List[int], bytes]) \
+			bytesuid: Union[List[int], bytes, bytearray, memoryview]) \
 			-> str:
     """Convert bytes or a list of integers into a human-readable UID
     """
 
-    return "".join(["{:02X}".format(b) for b in bytesuid])
+    if isinstance(bytesuid, list):
+      bytesuid = bytes(bytesuid)
+    return bytesuid.hex().upper()
 
 
 
@@ -800,12 +974,12 @@ class uFRcomm:
     """Convert a human-readable UID into bytes
     """
 
-    return bytes([int(struid[i : i + 2], 16) for i in range(0, len(struid), 2)])
+    return bytes.fromhex(struid)
 
 
 
   def _send_data(self: uFRcomm,
-			data: Union[List[int], bytes]) \
+			data: Union[List[int], bytes, memoryview]) \
 			-> None:
     """Send a data packet
     """
@@ -815,6 +989,11 @@ class uFRcomm:
 		and self.websock is None and self.resturl is None:
       raise uFRIOError("device not open")
 
+    # Only convert lists of integers: bytes-like data is sent as is, without
+    # copying it
+    if isinstance(data, list):
+      data = bytes(data)
+
     # Send to a serial device
     if self.serdev is not None:
       self.serdev.write(data)
@@ -822,11 +1001,11 @@ class uFRcomm:
 
     # Send to a UDP host
     elif self.udpsock is not None:
-      self.udpsock.sendto(bytes(data), (self._udphost, self._udpport))
+      self.udpsock.sendto(data, self._udpaddr)
 
     # Send to a TCP host
     elif self.tcpsock is not None:
-      self.tcpsock.sendall(bytes(data))
+      self.tcpsock.sendall(data)
 
     # Send to a websocket host
     elif self.websock is not None:
@@ -834,14 +1013,14 @@ class uFRcomm:
 
     # "Send" to a HTTP server
     elif self.resturl is not None:
-      self.__postdata = "".join(["{:02X}".format(b) for b in data])
+      self.__postdata = data.hex().upper()
 
 
 
   def _get_data(self: uFRcomm,
 		timeout: Optional[float] = None) \
 		-> bytes:
-    """Receive data
+    """Receive data, either from the receive thread or from the device directly
     """
 
     # Throw an exception if a device is not open
@@ -849,6 +1028,85 @@ class uFRcomm:
 		and self.websock is None and self.resturl is None:
       raise uFRIOError("device not open")
 
+    if self.__rxqueue is None:
+      return self._read_data(timeout = timeout)
+
+    data: Union[bytes, Exception]
+    try:
+      data = self.__rxqueue.get(timeout = self._default_timeout \
+					if timeout is None else timeout)
+    except queue.Empty:
+      raise TimeoutError
+
+    # Re-raise exceptions that occured in the receive thread
+    if isinstance(data, Exception):
+      raise data
+
+    return data
+
+
+
+  def _rx_thread_loop(self: uFRcomm) \
+			-> None:
+    """Receive data from the device and queue it up until told to stop
+    The thread waits for incoming data with select() and the poll period, then
+    reads it with the normal timeout, so it never changes the device's timeout
+    the main thread sends with
+    """
+
+    data: bytes
+    dev: Any = self.serdev if self.serdev is not None else \
+		self.udpsock if self.udpsock is not None else \
+		self.tcpsock if self.tcpsock is not None else self.websock
+
+    # Serial devices can't be select()ed on Windows: block in the read instead,
+    # at the cost of the thread taking up to the timeout to stop
+    selectable: bool = True
+    try:
+      dev.fileno()
+    except (AttributeError, OSError):
+      selectable = False
+
+    while self.__rxthread_running:
+      try:
+        if selectable and not select.select([dev], [], [],
+						_rx_thread_poll_period)[0]:
+          continue
+        data = self._read_data()
+      except TimeoutError:
+        continue
+      # A bad response doesn't stop the reception: pass it on and keep going
+      except uFRresponseError as e:
+        self.__rxqueue.put(e)
+        continue
+      # Any other error is an I/O error that ends the reception
+      except Exception as e:
+        if self.__rxthread_running:
+          self.__rxqueue.put(e)
+        return
+      self.__rxqueue.put(data)
+
+
+
+  def _stop_rx_thread(self: uFRcomm) \
+			-> None:
+    """Stop the receive thread if it's running
+    """
+
+    self.__rxthread_running = False
+    if self.__rxthread is not None:
+      self.__rxthread.join()
+      self.__rxthread = None
+    self.__rxqueue = None
+
+
+
+  def _read_data(self: uFRcomm,
+		timeout: Optional[float] = None) \
+		-> bytes:
+    """Read data from the device
+    """
+
     data: bytes
     ip: str
     reset_timeout: bool
@@ -866,7 +1124,9 @@ class uFRcomm:
     if self.serdev is not None:
       if reset_timeout:
         self.serdev.timeout = self._current_timeout
-      data = self.serdev.read(1)
+      # Read everything that's already buffered in one go, or block until at
+      # least one byte comes in
+      data = self.serdev.read(self.serdev.in_waiting or 1)
       if not data:
         raise TimeoutError
 
@@ -874,26 +1134,39 @@ class uFRcomm:
     elif self.udpsock is not None:
       if reset_timeout:
         self.udpsock.settimeout(self._current_timeout)
-      timeout_tstamp = datetime.now().timestamp() + self._current_timeout
+      timeout_tstamp = monotonic() + self._current_timeout
+      timeout_shortened: bool = False
       data = b""
-      while not data:
-        try:
-          data, (ip, _) = self.udpsock.recvfrom(1024)
-        except socket.timeout:
-          raise TimeoutError
-        if ip != self._udphost:
-          data = b""
-        if not data and datetime.now().timestamp() >= timeout_tstamp:
-          raise TimeoutError
+      try:
+        while not data:
+          try:
+            data, (ip, _) = self.udpsock.recvfrom(_socket_recv_size)
+          except socket.timeout:
+            raise TimeoutError
+          if ip != self._udphost:
+            data = b""
+
+            # Only wait for what's left of the timeout after a datagram from
+            # another host, rather than for the whole timeout again
+            remaining: float = timeout_tstamp - monotonic()
+            if remaining <= 0:
+              raise TimeoutError
+            self.udpsock.settimeout(remaining)
+            timeout_shortened = True
+      finally:
+        if timeout_shortened:
+          self.udpsock.settimeout(self._current_timeout)
 
     # Receive from a TCP host
     elif self.tcpsock is not None:
       if reset_timeout:
         self.tcpsock.settimeout(self._current_timeout)
       try:
-        data = self.tcpsock.recv(1024)
+        data = self.tcpsock.recv(_socket_recv_size)
       except socket.timeout:
         raise TimeoutError
+      if not data:
+        raise uFRIOError("connection closed by the remote host")
 
     # Receive from a websocket host
     elif self.websock is not None:
@@ -911,23 +1184,48 @@ class uFRcomm:
 
     # Receive a POST reply from a HTTP server
     elif self.resturl is not None:
+      # The posted data is consumed whether the POST succeeds or not, so that
+      # a failed command isn't posted again with the next one
       try:
-        resp: str = requests.post(self.resturl, data = self.__postdata,
+        resp: str = self.__httpsession.post(self.resturl,
+			data = self.__postdata,
 			timeout = self._current_timeout).text.rstrip("\r\n\0 ")
       except requests.exceptions.ConnectTimeout:
         raise TimeoutError
-      if not re.match("^([0-9a-zA-Z][0-9a-zA-Z])+$", resp):
-        if not resp:
-          raise uFRresponseError("empty HTTP POST response")
-        else:
-          raise uFRresponseError("invalid HTTP POST response: {}".format(resp))
-      data = self._uid_str2bytes(resp)
-      self.__postdata = ""
+      finally:
+        self.__postdata = ""
+      if not resp:
+        raise uFRresponseError("empty HTTP POST response")
+      try:
+        data = bytes.fromhex(resp)
+      except ValueError:
+        raise uFRresponseError("invalid HTTP POST response: {}".format(resp))
 
     return data
 
 
 
+  @staticmethod
+  @lru_cache(maxsize = 256)
+  def _cmd_packet(cmd: int,
+			par0: int,
+			par1: int,
+			ext_len: int) \
+			-> bytes:
+    """Build a short command packet. Packets are cached, as the same commands
+    are usually sent over and over again with the same parameters
+    """
+
+    # Pack the packet in one go, with the checksum computed inline rather than
+    # by iterating over the packet
+    header: int = uFRcomm.__UFR_CMD_HEADER
+    trailer: int = uFRcomm.__UFR_CMD_TRAILER
+    return uFRcomm.__UFR_CMD_PACKET.pack(header, cmd, trailer,
+			ext_len, par0, par1,
+			((header ^ cmd ^ trailer ^ ext_len ^ par0 ^ par1) + 0x07) % 256)
+
+
+
   def _send_cmd(self: uFRcomm,
 		cmd: uFRcmd,
 		par0: int = 0,
@@ -938,11 +1236,9 @@ class uFRcomm:
     """Send a short command
     """
 
-    packet: List[int] = [uFRhead.CMD_HEADER.value, cmd.value,
-			uFRtrail.CMD_TRAILER.value, ext_len, par0, par1]
-    packet.append(self._checksum(packet))
+    packet: bytes = self._cmd_packet(cmd, par0, par1, ext_len)
     if preamble:
-      packet = list(preamble) + packet
+      packet = bytes(preamble) + packet
 
     self._send_data(packet)
 
@@ -951,12 +1247,12 @@ class uFRcomm:
 
 
   def _send_ext(self: uFRcomm,
-		ext_parms: Union[List[int], bytes]) \
+		ext_parms: Union[List[int], bytes, bytearray]) \
 		-> None:
     """Sent extended command parameters
     """
 
-    packet = list(ext_parms)
+    packet: bytearray = bytearray(ext_parms)
     packet.append(self._checksum(packet))
     self._send_data(packet)
 
@@ -966,7 +1262,7 @@ class uFRcomm:
 			cmd: uFRcmd,
 			par0: int,
 			par1: int,
-			ext_parms: Union[List[int], bytes],
+			ext_parms: Union[List[int], bytes, bytearray],
 			timeout: Optional[float] = None) \
 			-> None:
     """Send an extended command in two steps: first the short command, wait for
@@ -997,149 +1293,145 @@ class uFRcomm:
 
 
 
-  def _get_answer(self: uFRcomm,
+  def _fill_recbuf(self: uFRcomm,
 			timeout: Optional[float] = None) \
-			-> uFRanswer:
-    """Get an answer packet
+			-> None:
+    """Discard the part of the receive buffer that has already been parsed and
+    append newly received data to the rest
     """
 
-    self.answer.wipe()
+    del self.__recbuf[:self.__recbuf_pos]
+    self.__recbuf_pos = 0
+    self.__recbuf += self._get_data(timeout = timeout)
 
-    nb_ext_bytes_remaining: int = -1
 
-    while True:
 
-      # Read data if the receive buffer is empty
-      if not self.__recbuf:
-        self.__recbuf.extend(self._get_data(timeout = timeout))
-
-      # Parse the receive buffer
-      b: int = self.__recbuf.pop(0)
-
-      # Get header, or the asynchronous ID sending prefix if it's enabled
-      if not self.answer._got_header and not self.answer._got_async_id_prefix:
-        if b in self.__UFR_HEADER_VALS:
-          self.answer.header = b
-          self.answer.is_ack = (b == uFRhead.ACK_HEADER)
-          self.answer.is_err = (b == uFRhead.ERR_HEADER)
-          self.answer.is_rsp = (b == uFRhead.RESPONSE_HEADER)
-          self.answer._got_header = True
-        elif self.__async_id_enabled and b == self.__async_id_prefix:
-          self.answer._got_async_id_prefix = True
-          self.answer.async_id = ""
-        continue
+  def _get_answer(self: uFRcomm,
+			timeout: Optional[float] = None) \
+			-> uFRanswer:
+    """Get an answer packet
+    Whole packets are parsed at once from the receive buffer rather than byte
+    by byte. Invalid packets are skipped one byte at a time to resynchronize
+    """
+
+    # Local references to avoid attribute lookups in the parsing loop
+    answer: uFRanswer = self.answer
+    recbuf: bytearray = self.__recbuf
+    val_to_cmd: Dict[int, uFRcmd] = self.__UFR_VAL_TO_CMD
+    val_to_err: Dict[int, uFRerr] = self.__UFR_VAL_TO_ERR
+    header_flags: Dict[int, Tuple[bool, bool, bool]] = self.__UFR_HEADER_FLAGS
+    header_to_trailer: Dict[int, int] = self.__UFR_HEADER_TO_TRAILER
+    unpack_from: Callable = self.__UFR_CMD_PACKET.unpack_from
+    async_id_enabled: bool = self.__async_id_enabled
+    async_id_prefix: int = self.__async_id_prefix
+    async_id_suffix: int = self.__async_id_suffix
+
+    answer.wipe()
+
+    pos: int
+    end: int
+    header: int
+    code: int
+    code_enum: Optional[Union[uFRcmd, uFRerr]]
+    trailer: int
+    ext_len: int
+    val0: int
+    val1: int
+    checksum: int
+    is_ack: bool
+    is_err: bool
+    is_rsp: bool
 
-      # If asynchronous ID sending is enabled and we got the prefix, get the
-      # ID until we hit the suffix
-      if self.__async_id_enabled and self.answer._got_async_id_prefix:
+    while True:
 
-        # If we got a hex digit, add it to the ID
-        if b in b"0123456789ABCDEF":
-          self.answer.async_id += chr(b)
+      # Read data if the receive buffer has been entirely parsed
+      if self.__recbuf_pos >= len(recbuf):
+        self._fill_recbuf(timeout = timeout)
 
-        # If we hit the suffix and the ID we got is an even number of digits,
-        # normalize it and return the answer
-        elif b == self.__async_id_suffix and not len(self.answer.async_id) & 1:
-          self.answer.is_async_id = True
-          return self.answer
+      pos = self.__recbuf_pos
+      b: int = recbuf[pos]
 
-        else:
-          self.answer.wipe()
+      # Get a complete answer packet
+      if b in header_flags:
 
-        continue
+        # Wait for the rest of the packet if we don't have it all yet
+        if len(recbuf) - pos < 7:
+          self._fill_recbuf(timeout = timeout)
+          continue
 
-      # Get the code (either command or error)
-      if not self.answer._got_code:
-        if (self.answer.is_ack or self.answer.is_rsp) and \
-		b in self.__UFR_CMD_VALS:
-          self.answer.code = self.__UFR_VAL_TO_CMD[b]
-          self.answer._got_code = True
-        elif self.answer.is_err and b in self.__UFR_ERR_VALS:
-          self.answer.code = self.__UFR_VAL_TO_ERR[b]
-          self.answer._got_code = True
-        else:
-          self.answer.wipe()
-        continue
+        header, code, trailer, ext_len, val0, val1, checksum = \
+						unpack_from(recbuf, pos)
+        is_ack, is_err, is_rsp = header_flags[header]
+        code_enum = (val_to_err if is_err else val_to_cmd).get(code)
+
+        # Skip the header byte if the packet is invalid
+        if code_enum is None or \
+		trailer != header_to_trailer[header] or ext_len == 1 or \
+		checksum != ((header ^ code ^ trailer ^ ext_len ^ \
+				val0 ^ val1) + 0x07) % 256:
+          self.__recbuf_pos = pos + 1
+          continue
 
-      # Get the trailer
-      if not self.answer._got_trailer:
-        if (self.answer.header == uFRhead.ACK_HEADER and \
-			b == uFRtrail.ACK_TRAILER) or \
-		(self.answer.header == uFRhead.ERR_HEADER and \
-			b == uFRtrail.ERR_TRAILER) or \
-		(self.answer.header == uFRhead.RESPONSE_HEADER and \
-			b == uFRtrail.RESPONSE_TRAILER):
-          self.answer.trailer = b
-          self.answer._got_trailer = True
-        else:
-          self.answer.wipe()
-        continue
+        # Get the extended packet and its checksum if the answer has one
+        end = pos + 7
+        if ext_len and not is_ack:
 
-      # Get the length of the returned parameters
-      if not self.answer._got_ext_len:
-        if b == 0 or b >= 2:
-          self.answer.ext_len = b
-          self.answer.has_ext = (b != 0)
-          self.answer._got_ext_len = True
-        else:
-          self.answer.wipe()
-        continue
+          end += ext_len
+          if len(recbuf) < end:
+            self._fill_recbuf(timeout = timeout)
+            continue
 
-      # Get val0
-      if not self.answer._got_val0:
-        self.answer.val0 = b
-        self.answer._got_val0 = True
-        continue
+          if self._checksum(memoryview(recbuf)[pos + 7 : end - 1]) != \
+			recbuf[end - 1]:
+            self.__recbuf_pos = end
+            continue
 
-      # Get val1
-      if not self.answer._got_val1:
-        self.answer.val1 = b
-        self.answer._got_val1 = True
-        continue
+          answer.ext = recbuf[pos + 7 : end - 1]
+          answer.ext_checksum = recbuf[end - 1]
 
-      # Get the checksum
-      if not self.answer._got_checksum:
-        if self._checksum((self.answer.header, self.answer.code.value,
-		self.answer.trailer, self.answer.ext_len,
-		self.answer.val0, self.answer.val1)) == b:
-          self.answer.checksum = b
-          self.answer._got_checksum = True
+        self.__recbuf_pos = end
 
-          # If the response is short, return it immediately
-          if not self.answer.has_ext or self.answer.is_ack:
-            return self.answer
+        answer.is_ack = is_ack
+        answer.is_err = is_err
+        answer.is_rsp = is_rsp
+        answer.has_ext = (ext_len != 0)
+        answer.header = header
+        answer.code = code_enum
+        answer.trailer = trailer
+        answer.ext_len = ext_len
+        answer.val0 = val0
+        answer.val1 = val1
+        answer.checksum = checksum
 
-        else:
-          self.answer.wipe()
-        continue
+        return answer
 
-      # Get the extended packet
-      if not self.answer._got_ext:
+      # If asynchronous ID sending is enabled and we got the prefix, get the
+      # ID until we hit the suffix
+      if async_id_enabled and b == async_id_prefix:
 
-        # Get the first byte of the extended packet
-        if nb_ext_bytes_remaining < 0:
-          self.answer.ext = [b]
-          nb_ext_bytes_remaining = self.answer.ext_len - 2
-          continue
+        # Find the first byte that isn't a hex digit after the prefix
+        end = pos + 1
+        while end < len(recbuf) and recbuf[end] in b"0123456789ABCDEF":
+          end += 1
 
-        # Get the rest of the extended packet
-        elif nb_ext_bytes_remaining > 0:
-          self.answer.ext.append(b)
-          nb_ext_bytes_remaining -= 1
+        # Wait for more data if we don't have the suffix yet
+        if end >= len(recbuf):
+          self._fill_recbuf(timeout = timeout)
           continue
 
-        else:
-          self.answer._got_ext = True
+        self.__recbuf_pos = end + 1
 
-      # Get the extended packet's checksum
-      if self._checksum(self.answer.ext) == b:
-        self.answer.ext_checksum = b
+        # If we hit the suffix and the ID we got is an even number of digits,
+        # return the answer
+        if recbuf[end] == async_id_suffix and not (end - pos - 1) & 1:
+          answer.async_id = recbuf[pos + 1 : end].decode("ascii")
+          answer.is_async_id = True
+          return answer
 
-        # Return the long answer
-        return self.answer
+        continue
 
-      else:
-        self.answer.wipe()
+      # Skip bytes that don't start an answer
+      self.__recbuf_pos = pos + 1
 
 
 
@@ -1151,18 +1443,18 @@ class uFRcomm:
     If we get anything else, raise an exception.
     """
 
-    # Read data if the receive buffer is empty
-    if not self.__recbuf:
-      data = self._get_data(timeout = timeout)
-      self.__recbuf.extend(data)
+    # Read data if the receive buffer has been entirely parsed
+    if self.__recbuf_pos >= len(self.__recbuf):
+      self._fill_recbuf(timeout = timeout)
 
     # Parse one byte
-    b: int = self.__recbuf.pop(0)
+    b: int = self.__recbuf[self.__recbuf_pos]
+    self.__recbuf_pos += 1
 
     # Did we get an ACK?
-    if b == uFRcmdExtPartAck.ACK_PART:
+    if b == self.__UFR_ACK_PART:
       return True
-    if b == uFRcmdExtPartAck.ACK_LAST_PART:
+    if b == self.__UFR_ACK_LAST_PART:
       return False
 
     # We got an unexpected byte
@@ -1176,10 +1468,12 @@ class uFRcomm:
 
 
   def _get_last_command_response(self: uFRcomm,
-				timeout: Optional[float] = None) \
+				timeout: Optional[float] = None,
+				allowed_errors: Tuple[uFRerr, ...] = ()) \
 				-> uFRanswer:
     """Get a responde to the last command sent. Throw an exception if the
-    answer is unexpected
+    answer is unexpected. Errors listed in allowed_errors are returned as
+    answers instead of throwing an exception
     """
 
     while True:
@@ -1189,6 +1483,9 @@ class uFRcomm:
       else:
         break
 
+    if answer.is_err and answer.code in allowed_errors:
+      return answer
+
     if not answer.is_rsp or answer.code != self._last_cmd:
       raise uFRresponseError("expected response to {} - got {}".format(
 				self._last_cmd.name, answer))
@@ -1209,6 +1506,7 @@ class uFRcomm:
 
     pcd_mgr_state: uFRPCDMgrState
     emu_mode: uFRemuMode
+    emu_disabled: Optional[bool] = None
 
     # Should we restore the emulation / ad-hoc (peer-to-peer) modes?
     if self.__saved_pcd_mgr_state is not None and \
@@ -1236,15 +1534,20 @@ class uFRcomm:
           self.tag_emulation_stop(timeout = timeout)
         self.ad_hoc_emulation_start(timeout = timeout)
 
-    # Recheck if emulation is disabled if we should restore the anti-collision
-    # mode or the asynchronous ID sending parameters
+      # Whichever way we got there, emulation is now disabled only if it was
+      # saved disabled, so there's no need to query the reader again
+      emu_disabled = (self.__saved_emu_mode == uFRemuMode.TAG_EMU_DISABLED)
+
+    # Check if emulation is disabled if we should restore the anti-collision
+    # mode or the asynchronous ID sending parameters, unless we already know
     if (self.__saved_anti_collision_enabled is not None or (
 		self.__saved_async_flags is not None and \
 		self.__saved_async_prefix is not None and \
 		self.__saved_async_suffix is not None and \
 		self.__saved_async_baudrate is not None)) and \
+		(emu_disabled if emu_disabled is not None else \
 		self.get_reader_status(timeout = timeout)[1] == \
-		uFRemuMode.TAG_EMU_DISABLED:
+		uFRemuMode.TAG_EMU_DISABLED):
 
       # Should we restore the anti-collision mode?
       if self.__saved_anti_collision_enabled is not None:
@@ -1317,6 +1620,23 @@ class uFRcomm:
 
 
 
+  def tune_waits(self: uFRcomm,
+			factor: float) \
+			-> None:
+    """Scale the extra delays following certain commands for this reader. Use
+    a factor below 1 to shorten them if your reader is known to recover faster
+    than the default delays assume
+    """
+
+    self._post_wake_up_wait = _post_wake_up_wait * factor
+    self._post_reset_wait = _post_reset_wait * factor
+    self._post_write_emulation_ndef_wait = \
+				_post_write_emulation_ndef_wait * factor
+    self._post_emulation_start_stop_wait = \
+				_post_emulation_start_stop_wait * factor
+
+
+
   def close(self: uFRcomm,
 		restore = True,
 		timeout: Optional[float] = None) \
@@ -1333,6 +1653,8 @@ class uFRcomm:
       except:
         pass
 
+    self._stop_rx_thread()
+
     if self.serdev is not None:
       self.serdev.close()
       self.serdev = None
@@ -1343,6 +1665,7 @@ class uFRcomm:
       self.udpsock = None
       self._udphost = None
       self._udpport = None
+      self._udpaddr = None
 
     if self.tcpsock is not None:
       self.tcpsock.close()
@@ -1352,13 +1675,18 @@ class uFRcomm:
       self.websock.close()
       self.websock = None
 
+    if self.__httpsession is not None:
+      self.__httpsession.close()
+      self.__httpsession = None
+
     self.resturl = None
     self.__postdata = ""
 
     self._default_timeout = _default_ufr_timeout
     self._current_timeout = _default_ufr_timeout
 
-    self.__recbuf = []
+    self.__recbuf = bytearray()
+    self.__recbuf_pos = 0
 
     self._last_cmd = uFRcmd._UNDEFINED
 
@@ -1366,6 +1694,8 @@ class uFRcomm:
 
     self._async_ids_cache = []
 
+    self._reader_info_cache = {}
+
 
 
   def __enter__(self: uFRcomm) \
@@ -1402,6 +1732,7 @@ class uFRcomm:
   #
   # Incomplete - functions will be added as needed
 
+  @_cached_reader_info
   def get_reader_type(self: uFRcomm,
 			timeout: Optional[float] = None) \
 			-> int:
@@ -1410,12 +1741,11 @@ class uFRcomm:
 
     self._send_cmd(uFRcmd.GET_READER_TYPE)
     rsp: uFRanswer = self._get_last_command_response(timeout = timeout)
-    return rsp.ext[0] + (rsp.ext[1] << 8) + \
-		(rsp.ext[2] << 16) + (rsp.ext[3] << 24) \
-		if isinstance(rsp.ext, list) else -1
+    return int.from_bytes(rsp.ext_mv[:4], "little") if rsp.has_ext else -1
 
 
 
+  @_cached_reader_info
   def get_reader_serial(self: uFRcomm,
 			timeout: Optional[float] = None) \
 			-> int:
@@ -1424,11 +1754,11 @@ class uFRcomm:
 
     self._send_cmd(uFRcmd.GET_READER_SERIAL)
     rsp: uFRanswer = self._get_last_command_response(timeout = timeout)
-    return rsp.ext[0] + (rsp.ext[1] << 8) + \
-		(rsp.ext[2] << 16) + (rsp.ext[3] << 24)
+    return int.from_bytes(rsp.ext_mv[:4], "little")
 
 
 
+  @_cached_reader_info
   def get_serial_number(self: uFRcomm,
 			timeout: Optional[float] = None) \
 			-> str:
@@ -1437,10 +1767,11 @@ class uFRcomm:
 
     self._send_cmd(uFRcmd.GET_SERIAL_NUMBER)
     rsp: uFRanswer = self._get_last_command_response(timeout = timeout)
-    return bytes(rsp.ext).decode("ascii")
+    return rsp.ext.decode("ascii")
 
 
 
+  @_cached_reader_info
   def get_hardware_version(self: uFRcomm,
 				timeout: Optional[float] = None) \
 				-> int:
@@ -1453,6 +1784,7 @@ class uFRcomm:
 
 
 
+  @_cached_reader_info
   def get_firmware_version(self: uFRcomm,
 				timeout: Optional[float] = None) \
 				-> int:
@@ -1465,6 +1797,7 @@ class uFRcomm:
 
 
 
+  @_cached_reader_info
   def get_build_number(self: uFRcomm,
 			timeout: Optional[float] = None) \
 			-> int:
@@ -1483,7 +1816,7 @@ class uFRcomm:
     """
 
     self._send_cmd(uFRcmd.USER_DATA_READ)
-    return self._get_last_command_response(timeout = timeout).ext
+    return list(self._get_last_command_response(timeout = timeout).ext)
 
 
 
@@ -1514,8 +1847,7 @@ class uFRcomm:
       else:
         raise
     return (self.__UFR_VAL_TO_CARD_TYPE.get(rsp.val0, uFRcardType._UNDEFINED),
-		(rsp.ext[0] << 24) + (rsp.ext[1] << 16) + \
-		(rsp.ext[2] << 8) + rsp.ext[3])
+		int.from_bytes(rsp.ext_mv[:4], "big"))
 
 
 
@@ -1534,7 +1866,35 @@ class uFRcomm:
       else:
         raise
     return (self.__UFR_VAL_TO_CARD_TYPE.get(rsp.val0, uFRcardType._UNDEFINED),
-		self._uid_bytes2str(rsp.ext[:rsp.val1]))
+		self._uid_bytes2str(rsp.ext_mv[:rsp.val1]))
+
+
+
+  def get_card_id_blocking(self: uFRcomm,
+				wait: float,
+				timeout: Optional[float] = None) \
+				-> Tuple[uFRcardType, str]:
+    """Wait up to wait seconds for a card to come in the field and return its
+    type and UID (4, 7 or 10 bytes) as soon as it's detected
+    The COM protocol has no blocking "card present" command, so the reader is
+    polled with GET_CARD_ID_EX. Each poll gets the normal command timeout: the
+    wait only decides whether to start another poll
+    Return (uFRcardType._NO_CARD, "") if no card came in the field in time
+    """
+
+    deadline: float = monotonic() + wait
+    remaining: float
+    cid: Tuple[uFRcardType, str]
+
+    while True:
+      cid = self.get_card_id_ex(timeout = timeout)
+      if cid[0] != uFRcardType._NO_CARD:
+        return cid
+
+      remaining = deadline - monotonic()
+      if remaining <= 0:
+        return (uFRcardType._NO_CARD, "")
+      sleep(min(_card_poll_period, remaining))
 
 
 
@@ -1554,7 +1914,7 @@ class uFRcomm:
       else:
         raise
     return (self.__UFR_VAL_TO_CARD_TYPE.get(rsp.val0, uFRcardType._UNDEFINED),
-		self._uid_bytes2str(rsp.ext[:rsp.val1]))
+		self._uid_bytes2str(rsp.ext_mv[:rsp.val1]))
 
 
 
@@ -1590,67 +1950,36 @@ class uFRcomm:
     """
 
     # Define the command parameters
-    part1: int
-    cmdext: List[int] = [addr & 0xff, addr >> 8]
-
-    if authmode in (uFRauthMode.RKA_AUTH1A, uFRauthMode.RKA_AUTH1B):
-      if isinstance(key, int):
-        par1 = key
-      else:
-        raise TypeError("key should be an int")
-      if length < 192 or not multiblock:
-        cmdext.extend([length & 0xff, length >> 8])
-      else:
-        cmdext.extend([0, 192, length & 0xff, length >> 8])
+    key_index: bool
+    multiblock_ok: bool
+    key_bytes: bool
+    try:
+      key_index, multiblock_ok, key_bytes = \
+				self.__UFR_AUTH_MODE_PARMS[authmode]
+    except KeyError:
+      raise ValueError("unsupported authentication mode {}".format(authmode))
 
-    elif authmode in (uFRauthMode.AKM1_AUTH1A, uFRauthMode.AKM1_AUTH1B,
-		uFRauthMode.AKM2_AUTH1A, uFRauthMode.AKM2_AUTH1B):
-      par1 = 0
-      cmdext.extend([length & 0xff, length >> 8])
+    par1: int = 0
+    pack_u16: Callable = self.__UFR_U16.pack
+    cmdext: bytearray = bytearray(pack_u16(addr))
 
-    elif authmode in (uFRauthMode.PK_AUTH1A, uFRauthMode.PK_AUTH1B):
-      par1 = 0
-      cmdext.extend([length & 0xff, length >> 8])
-      if isinstance(key, list) or isinstance(key, tuple) or \
-		isinstance(key, bytes):
-        cmdext.extend(list(key))
-      else:
-        raise TypeError("key should be a tuple, list or bytes")
-
-    elif authmode in (uFRauthMode.SAM_KEY_AUTH1A, uFRauthMode.SAM_KEY_AUTH1B):
+    if key_index:
       if isinstance(key, int):
         par1 = key
       else:
         raise TypeError("key should be an int")
-      if length < 192 or not multiblock:
-        cmdext.extend([length & 0xff, length >> 8])
-      else:
-        cmdext.extend([0, 192, length & 0xff, length >> 8])
 
-    elif authmode in (uFRauthMode.PK_AUTH1A_AES, uFRauthMode.PK_AUTH1B_AES):
-      par1 = 0
-      cmdext.extend([length & 0xff, length >> 8])
+    if multiblock_ok and multiblock and length >= 192:
+      cmdext += b"\x00\xc0"
+    cmdext += pack_u16(length)
+
+    if key_bytes:
       if isinstance(key, list) or isinstance(key, tuple) or \
 		isinstance(key, bytes):
-        cmdext.extend(list(key))
+        cmdext += bytes(key)
       else:
         raise TypeError("key should be a tuple, list or bytes")
 
-    elif authmode in (uFRauthMode.MFP_RKA_AUTH1A, uFRauthMode.MFP_RKA_AUTH1B):
-      if isinstance(key, int):
-        par1 = key
-      else:
-        raise TypeError("key should be an int")
-      if length < 192 or not multiblock:
-        cmdext.extend([length & 0xff, length >> 8])
-      else:
-        cmdext.extend([0, 192, length & 0xff, length >> 8])
-
-    elif authmode in (uFRauthMode.MFP_AKM1_AUTH1A, uFRauthMode.MFP_AKM1_AUTH1B,
-		uFRauthMode.MFP_AKM2_AUTH1A, uFRauthMode.MFP_AKM2_AUTH1B):
-      par1 = 0
-      cmdext.extend([length & 0xff, length >> 8])
-
     # Send the command and read back the data
     self._send_cmd_ext(uFRcmd.LINEAR_READ, authmode.value, par1, cmdext,
 			timeout = timeout)
@@ -1744,8 +2073,7 @@ class uFRcomm:
     if rsp.ext[7] != self._checksum(rsp.ext[:7]):
       raise uFRresponseError("asynchronous parameters checksum error")
 
-    baudrate: int = rsp.ext[3] + (rsp.ext[4] << 8) + \
-			(rsp.ext[5] << 16) + (rsp.ext[6] << 24)
+    baudrate: int = int.from_bytes(rsp.ext_mv[3:7], "little")
     if save_status:
       self.__saved_async_flags = rsp.ext[0]
       self.__saved_async_prefix = rsp.ext[1]
@@ -1765,14 +2093,48 @@ class uFRcomm:
 
     self._send_cmd(uFRcmd.GET_RF_ANALOG_SETTINGS, tag_comm_type.value)
     rsp: uFRanswer = self._get_last_command_response(timeout = timeout)
-    return rsp.ext
+    return list(rsp.ext)
+
+
+
+  def get_rf_analog_settings_all(self: uFRcomm,
+				timeout: Optional[float] = None) \
+				-> Dict[uFRtagCommType, List[int]]:
+    """Get the RF frontend's analog settings for all the tag communication
+    types. Over the network, all the commands are sent in one go before
+    reading the responses back, so the latency of the connection is only paid
+    once. If one of the responses is an error or doesn't come, the remaining
+    responses are flushed before raising, so they don't get mistaken for the
+    answers to the next command
+    On a serial device, the commands are sent one at a time: the reader handles
+    one command at a time, and the round-trip time of a local serial link is
+    too short to be worth the risk of overrunning it
+    """
+
+    tct: uFRtagCommType
+    tcts: Tuple[uFRtagCommType, ...] = self.__UFR_TAG_COMM_TYPES
+
+    if self.serdev is not None:
+      return {tct: self.get_rf_analog_settings(tct, timeout = timeout) \
+		for tct in tcts}
+
+    self._send_data(b"".join([self._cmd_packet(uFRcmd.GET_RF_ANALOG_SETTINGS,
+			tct.value, 0, 0) for tct in tcts]))
+    self._last_cmd = uFRcmd.GET_RF_ANALOG_SETTINGS
+
+    try:
+      return {tct: list(self._get_last_command_response(
+		timeout = timeout).ext) for tct in tcts}
+    except:
+      self.flush(timeout = timeout)
+      raise
 
 
 
   def set_rf_analog_settings(self: uFRcomm,
 				tag_comm_type: uFRtagCommType,
 				factory_settings: bool,
-				settings: List[int],
+				settings: Union[List[int], bytes, bytearray],
 				timeout: Optional[float] = None) \
 				-> None:
     """Set the RF frontend's analog settings
@@ -1843,7 +2205,7 @@ class uFRcomm:
       self._send_cmd(uFRcmd.LEAVE_SLEEP_MODE)
 
     self._get_last_command_response(timeout = timeout)
-    sleep(_post_wake_up_wait)
+    sleep(self._post_wake_up_wait)
     self.__reader_asleep = False
 
 
@@ -1912,7 +2274,7 @@ class uFRcomm:
 
     self._send_cmd(uFRcmd.SELF_RESET)
     self._get_last_command_response(timeout = timeout)
-    sleep(_post_reset_wait)
+    sleep(self._post_reset_wait)
 
 
 
@@ -1935,37 +2297,40 @@ class uFRcomm:
     if (not in_ram and ndeflen > 144) or (in_ram and ndeflen > 1008):
       raise ValueError("NDEF too long")
 
-    # Split the NDEF into 240-byte-long parts
-    ext_parts: List[bytes] = [ndef[i:i + 240] for i in range(0, ndeflen, 240)]
-    if not ext_parts:
-      ext_parts = [b""]
+    # Split the NDEF into 240-byte-long parts. The parts are sliced from a view
+    # of the NDEF so each byte is only copied once, when it's prefixed
+    ndefmv: memoryview = memoryview(ndef)
+    chunk: memoryview
 
     # First CMD_EXT part is prefixed with the length of the NDEF, and suffixed
     # with the checksum of that part (but _send_cmd_ext() will take care of
     # appending the checksum)
-    ext_parts[0] = bytes([ndeflen & 0xff, ndeflen >> 8]) + ext_parts[0]
+    ext_parts: List[bytes] = [self.__UFR_U16.pack(ndeflen) + ndefmv[:240]]
 
     # Subsequent CMD_EXT parts are only prefixed with the length of that part
-    for i in range(1, len(ext_parts)):
-      ext_parts[i] = bytes([len(ext_parts[i])]) + ext_parts[i]
+    for i in range(240, ndeflen, 240):
+      chunk = ndefmv[i:i + 240]
+      ext_parts.append(bytes((len(chunk),)) + chunk)
 
     # Send the command and first CMD_EXT part
     self._send_cmd_ext(uFRcmd.WRITE_EMULATION_NDEF, 1 if in_ram else 0, 0,
-			ext_parts.pop(0), timeout = timeout)
+			ext_parts[0], timeout = timeout)
+    next_part: int = 1
 
     # Wait for ACKs and send subsequent parts if we have more than one part
-    if ext_parts:
+    if next_part < len(ext_parts):
       while self._get_cmd_ext_part_ack(timeout = timeout):
-        if not ext_parts:
+        if next_part >= len(ext_parts):
           raise uFRresponseError("expected {} ({:02x}h) - got {} ({:02x}h) with"
 					"no more CMD_EXT parts to send".format(
 					uFRcmdExtPartAck.ACK_LAST_PART.name,
 					uFRcmdExtPartAck.ACK_LAST_PART.value,
 					uFRcmdExtPartAck.ACK_PART.name,
 					uFRcmdExtPartAck.ACK_PART.value))
-        self._send_data(ext_parts.pop(0))
+        self._send_data(ext_parts[next_part])
+        next_part += 1
 
-    if ext_parts:
+    if next_part < len(ext_parts):
       raise uFRresponseError("expected {} ({:02x}h) - got {} ({:02x}h) "
 				"before sending the last CMD_EXT part".format(
 				uFRcmdExtPartAck.ACK_PART.name,
@@ -1974,7 +2339,7 @@ class uFRcomm:
 				uFRcmdExtPartAck.ACK_LAST_PART.value))
 
     self._get_last_command_response(timeout = timeout)
-    sleep(_post_write_emulation_ndef_wait)
+    sleep(self._post_write_emulation_ndef_wait)
 
 
 
@@ -1987,7 +2352,7 @@ class uFRcomm:
 
     self._send_cmd(uFRcmd.TAG_EMULATION_START, 1 if ram_ndef else 0)
     self._get_last_command_response(timeout = timeout)
-    sleep(_post_emulation_start_stop_wait)
+    sleep(self._post_emulation_start_stop_wait)
 
 
 
@@ -1999,7 +2364,7 @@ class uFRcomm:
 
     self._send_cmd(uFRcmd.TAG_EMULATION_STOP)
     self._get_last_command_response(timeout = timeout)
-    sleep(_post_emulation_start_stop_wait)
+    sleep(self._post_emulation_start_stop_wait)
 
 
 
@@ -2011,7 +2376,7 @@ class uFRcomm:
 
     self._send_cmd(uFRcmd.AD_HOC_EMULATION_START)
     self._get_last_command_response(timeout = timeout)
-    sleep(_post_emulation_start_stop_wait)
+    sleep(self._post_emulation_start_stop_wait)
 
 
 
@@ -2023,7 +2388,7 @@ class uFRcomm:
 
     self._send_cmd(uFRcmd.AD_HOC_EMULATION_STOP)
     self._get_last_command_response(timeout = timeout)
-    sleep(_post_emulation_start_stop_wait)
+    sleep(self._post_emulation_start_stop_wait)
 
 
 
@@ -2101,7 +2466,7 @@ class uFRcomm:
     the sound
     """
 
-    period: int = ((round(65535 - 1500000 / (2 * frequency))) & 0xffff) \
+    period: int = (round(65535 - 750000 / frequency) & 0xffff) \
 		if frequency > 0 else 0xffff
     self._send_cmd(uFRcmd.SET_SPEAKER_FREQUENCY, period & 0xff, period >> 8)
     self._get_last_command_response(timeout = timeout)
@@ -2111,12 +2476,14 @@ class uFRcomm:
 
   def set_iso14443_4_mode(self: uFRcomm,
 				timeout: Optional[float] = None) \
-				-> None:
+				-> bool:
     """Set ISO14443-4 mode
+    Return True if the mode was set, False if no card was present in the field
     """
 
     self._send_cmd(uFRcmd.SET_ISO14443_4_MODE)
-    self._get_last_command_response(timeout = timeout)
+    return self._get_last_command_response(timeout = timeout,
+			allowed_errors = (uFRerr.NO_CARD,)).is_rsp
 
 
 
@@ -2206,8 +2573,12 @@ class uFRcomm:
         return []
       else:
         raise
-    return [self._uid_bytes2str(rsp.ext[i + 1 : i + rsp.ext[i] + 1]) \
-		for i in range(0, len(rsp.ext), 11)]
+
+    # Slice the UIDs out of a view of the extended packet to avoid copying it
+    # for every card
+    ext: memoryview = rsp.ext_mv
+    return [ext[i + 1 : i + ext[i] + 1].hex().upper() \
+		for i in range(0, len(ext), 11)]
 
 
 
@@ -2306,7 +2677,7 @@ class uFRcomm:
     """
 
     self._send_cmd_ext(uFRcmd.ESP_SET_DISPLAY_DATA, duration_ms & 0xff,
-			duration_ms >> 8,list(rgb1) + list(rgb2),
+			duration_ms >> 8, bytes((*rgb1, *rgb2)),
 			timeout = timeout)
     self._get_last_command_response(timeout = timeout)
     self.__saved_esp_display_data_duration_ms = duration_ms
@@ -2321,7 +2692,7 @@ class uFRcomm:
 
     self._send_cmd(uFRcmd.ESP_READER_RESET, 0)
     self._get_last_command_response(timeout = timeout)
-    sleep(_post_reset_wait)
+    sleep(self._post_reset_wait)
 
 
 
@@ -2368,10 +2739,9 @@ class uFR:
         return None
 
       if response.ip != ip:
-        del(response)
         return None
 
-      return uFRdiscoveryResponse(data)
+      return response
 
 
 
@@ -2395,7 +2765,7 @@ class uFR:
       udpsock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 2000000)
 
       # Get the first host in the subnet
-      addr_generator: Generator = ipaddress.ip_network(netaddr).hosts()
+      addr_generator: Generator = ip_net.hosts()
       next_addr: str = str(next(addr_generator, ""))
       if not next_addr:
         return
@@ -2442,7 +2812,6 @@ class uFR:
           continue
 
         if response.ip != ip:
-          del(response)
           continue
 
         yield response
@@ -2469,12 +2838,12 @@ def __print_api_state_of_completion() \
 
   cmd_method: Dict[str, str] = {}
   cmd_impl_status: Dict[str, str] = {}
+  doc: str
   nb_impl: int = 0
   max_cmd_name_len: int = 0
   max_method_name_len: int = 0
   max_status_len: int = 0
   cmd: str
-  localparms: Dict[str, Any]
   m: Optional[List]
 
   # Get the status of all the commands in the COM protocol from whether the
@@ -2482,9 +2851,8 @@ def __print_api_state_of_completion() \
   # status markers in their docstrings
   for cmd in comcmds:
     if cmd.lower() in ufrcomm_pubclassmets:
-      localparms = {'uFRcomm': uFRcomm}
-      exec("doc = uFRcomm.{}.__doc__".format(cmd.lower()), {}, localparms)
-      m = re.findall("(STATUS|COMPLETION)\s*:\s*(.*)\n", localparms["doc"])
+      doc = getattr(uFRcomm, cmd.lower()).__doc__ or ""
+      m = _doc_status_regex.findall(doc)
       cmd_method[cmd] = cmd.lower() + "()"
       cmd_impl_status[cmd] = m[0][1] if m else "Implemented"
       nb_impl += 1
@@ -2544,6 +2912,11 @@ def __test_api(device: Optional[str],
   # Pretty line formatting
   pad: Callable = lambda s: "{:<30}".format(s)
 
+  # Sleep until a deadline rather than for a fixed time, so that sequences
+  # keep a steady pace regardless of how long the commands in between take
+  next_t: float
+  sleep_until: Callable = lambda t: sleep(max(0, t - monotonic()))
+
   ufr: uFR = uFR()
 
   # Test network probing functions - the device doesn't need to be open for this
@@ -2570,6 +2943,11 @@ def __test_api(device: Optional[str],
     print("No uFR device specified to test communication")
     return
 
+  # Is the device a Nano Online connected through the network, but not in HTTP
+  # mode, which bypasses the ESP and sends the commands directly to the UART?
+  via_esp: bool = ufrcomm.udpsock is not None or \
+		ufrcomm.tcpsock is not None or ufrcomm.websock is not None
+
   # Test reader information functions
   if __test_reader_info_functions:
 
@@ -2612,13 +2990,16 @@ def __test_api(device: Optional[str],
   # Test RF analog settings functions
   if __test_rf_analog_settings_functions:
 
+    print(pad("GET_RF_ANALOG_SETTINGS_ALL:"),
+		ufrcomm.get_rf_analog_settings_all())
+
     tct: uFRtagCommType
     for tct in uFRtagCommType:
       print(pad("GET_RF_ANALOG_SETTINGS:"), ufrcomm.get_rf_analog_settings(tct))
 
       if __test_eeprom_writing_functions:
 
-        new_settings: List[int] = list(ufrcomm.answer.ext)
+        new_settings: bytearray = bytearray(ufrcomm.answer.ext_mv)
         new_settings[PN53xAnalogSettingsReg.RXTHRESHOLD] = 255
         print("SET_RF_ANALOG_SETTINGS")
         ufrcomm.set_rf_analog_settings(tct, False, new_settings)
@@ -2640,8 +3021,7 @@ def __test_api(device: Optional[str],
     # Only test the ESP reset function if the device is a Nano Online connected
     # through the network, but not in HTTP mode, as it bypasses the ESP and
     # sends the commands directly to the UART
-    if ufrcomm.udpsock is not None or ufrcomm.tcpsock is not None or \
-		ufrcomm.websock is not None:
+    if via_esp:
 
       print("ESP_READER_RESET")
       ufrcomm.esp_reader_reset()
@@ -2664,19 +3044,27 @@ def __test_api(device: Optional[str],
       print("SET_LED_CONFIG")
       ufrcomm.set_led_config(True)
 
+    # Run the speaker test while the red light is on rather than waiting for
+    # it idly. Commands can't be sent from another thread, as they would get
+    # mixed up with the other tests' commands, so the light is turned off
+    # once the deadline has passed
     print("RED_LIGHT_CONTROL")
     ufrcomm.red_light_control(True)
-    sleep(2)
-    ufrcomm.red_light_control(False)
+    red_light_off_t: float = monotonic() + 2
 
     print("SET_SPEAKER_FREQUENCY")
     freq: float = 1480 / 4
+    next_t = monotonic()
     for i in range(3):
       ufrcomm.set_speaker_frequency(freq)
       freq *= 2
-      sleep(.1)
+      next_t += .1
+      sleep_until(next_t)
     ufrcomm.set_speaker_frequency(0)
 
+    sleep_until(red_light_off_t)
+    ufrcomm.red_light_control(False)
+
     print("USER_INTERFACE_SIGNAL")
     ufrcomm.user_interface_signal(uFRlightSignal.ALTERNATION,
 					uFRbeepSignal.SHORT)
@@ -2684,24 +3072,26 @@ def __test_api(device: Optional[str],
     # Only test the ESP LED function if the device is a Nano Online connected
     # through the network, but not in HTTP mode, as it bypasses the ESP and
     # sends the commands directly to the UART
-    if ufrcomm.udpsock is not None or ufrcomm.tcpsock is not None or \
-		ufrcomm.websock is not None:
+    if via_esp:
 
       print("ESP_SET_DISPLAY_DATA")
+      next_t = monotonic()
       for i in range(3):
         ufrcomm.esp_set_display_data((0xff, 0, 0), (0, 0xff, 0), 0)
-        sleep(0.1)
+        next_t += .1
+        sleep_until(next_t)
         ufrcomm.esp_set_display_data((0, 0xff, 0), (0, 0, 0xff), 0)
-        sleep(0.1)
+        next_t += .1
+        sleep_until(next_t)
         ufrcomm.esp_set_display_data((0, 0, 0xff), (0xff, 0, 0), 0)
-        sleep(0.1)
+        next_t += .1
+        sleep_until(next_t)
       ufrcomm.esp_set_display_data((0, 0, 0), (0, 0, 0), 1000)
 
   # Test ESP I/O functions - only works if the device is a Nano Online connected
   # through the network, but not in HTTP mode, as it mode bypasses the ESP and
   # sends the commands directly to the UART
-  if __test_esp_io and (ufrcomm.udpsock is not None or \
-		ufrcomm.tcpsock is not None or ufrcomm.websock is not None):
+  if __test_esp_io and via_esp:
 
     print("ESP_SET_IO_STATE")
     ufrcomm.esp_set_io_state(6, uFRIOState.HIGH)
@@ -2717,6 +3107,9 @@ def __test_api(device: Optional[str],
       print(pad("GET_CARD_ID:"),
 		(cid[0], "0x{:08X}".format(cid[1])) if cid else ())
       print(pad("GET_CARD_ID_EX:"), ufrcomm.get_card_id_ex())
+      if __test_blocking_uid_functions:
+        print("Waiting for a card...")
+        print(pad("GET_CARD_ID_BLOCKING:"), ufrcomm.get_card_id_blocking(3))
       print(pad("GET_LAST_CARD_ID_EX:"), ufrcomm.get_last_card_id_ex())
       print(pad("GET_DLOGIC_CARD_TYPE:"), ufrcomm.get_dlogic_card_type())
       print(pad("CHECK_UID_CHANGE:"), ufrcomm.check_uid_change())
@@ -2730,12 +3123,7 @@ def __test_api(device: Optional[str],
   # Test ISO14443-4 functions
   if __test_iso14443_4_functions:
 
-    print("SET_ISO_14443_4_MODE")
-    try:
-      ufrcomm.set_iso14443_4_mode()
-    except:
-      if ufrcomm.answer.code != uFRerr.NO_CARD:
-        raise
+    print(pad("SET_ISO_14443_4_MODE:"), ufrcomm.set_iso14443_4_mode())
 
   # Test anti-collision functions
   if __test_anti_collision_functions: